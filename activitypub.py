@@ -230,6 +230,12 @@ class ActivityPub(User, Protocol):
     @classmethod
     def target_for(cls, obj, shared=False):
         """Returns ``obj``'s or its author's/actor's inbox, if available."""
+        # fast path for stored AP actors: read their inboxes straight from as2
+        # instead of converting to AS1 and back. this is the common case when
+        # delivering to followers.
+        if obj.as2 and obj.as2.get('inbox'):
+            return cls._inbox(obj.as2, shared=shared)
+
         if not obj.as1:
             return None
 
@@ -251,8 +257,19 @@ class ActivityPub(User, Protocol):
 
             logger.info(f'{obj.key} type {obj.type} is not an actor and has no author or actor with inbox')
 
-        actor = cls._convert(obj)
+        return cls._inbox(cls._convert(obj), shared=shared)
+
+    @staticmethod
+    def _inbox(actor, shared=False):
+        """Returns an AS2 actor's inbox.
+
+        Args:
+          actor (dict): AS2 actor
+          shared (bool): whether to prefer its shared inbox, if available
 
+        Returns:
+          str or None:
+        """
         if shared:
             shared_inbox = actor.get('endpoints', {}).get('sharedInbox')
             if shared_inbox:
@@ -280,7 +297,8 @@ class ActivityPub(User, Protocol):
                                       from_user=from_user)
         activity = to_cls.convert(obj, from_user=from_user, orig_obj=orig_obj)
 
-        return signed_post(url, data=activity, from_user=from_user).ok
+        with common.fail_fast(util.domain_from_link(url, minimize=False)):
+            return signed_post(url, data=activity, from_user=from_user).ok
 
     @classmethod
     def fetch(cls, obj, **kwargs):
@@ -485,7 +503,8 @@ class ActivityPub(User, Protocol):
             error('No HTTP Signature', status=401)
 
         logger.debug('Verifying HTTP Signature')
-        logger.debug(f'Headers: {json_dumps(headers, indent=2)}')
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f'Headers: {json_dumps(headers, indent=2)}')
 
         # parse_signature_header lower-cases all keys
         sig_fields = parse_signature_header(sig)
@@ -629,7 +648,8 @@ def signed_request(fn, url, data=None, headers=None, from_user=None,
         from_user = instance_actor()
 
     if data:
-        logger.debug(f'Sending AS2 object: {json_dumps(data, indent=2)}')
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f'Sending AS2 object: {json_dumps(data, indent=2)}')
         data = json_dumps(data).encode()
 
     headers = {
@@ -1042,7 +1062,8 @@ def actor(handle_or_id):
         },
     })
 
-    logger.debug(f'Returning: {json_dumps(actor, indent=2)}')
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f'Returning: {json_dumps(actor, indent=2)}')
     return actor, {
         'Content-Type': as2_type,
         'Access-Control-Allow-Origin': '*',
@@ -1140,8 +1161,9 @@ def inbox(protocol=None, id=None):
         followee_url = unwrap(util.get_url(activity, 'object'))
         activity.setdefault('url', f'{follower_url}#followed-{followee_url}')
 
+    now = util.now().isoformat()
     if not id:
-        id = f'{actor_id}#{type}-{obj_id or ""}-{util.now().isoformat()}'
+        id = f'{actor_id}#{type}-{obj_id or ""}-{now}'
 
     # automatically bridge server aka instance actors
     # https://codeberg.org/fediverse/fep/src/branch/main/fep/d556/fep-d556.md
@@ -1157,7 +1179,7 @@ def inbox(protocol=None, id=None):
     delay = DELETE_TASK_DELAY if type in ('Delete', 'Undo') else None
     return create_task(queue='receive', id=id, as2=activity,
                        source_protocol=ActivityPub.LABEL, authed_as=authed_as,
-                       received_at=util.now().isoformat(), delay=delay)
+                       received_at=now, delay=delay)
 
 
 # protocol in subdomain
@@ -1206,7 +1228,8 @@ def follower_collection(id, collection):
             '@context': 'https://www.w3.org/ns/activitystreams',
             'id': request.url,
         })
-        logger.debug(f'Returning {json_dumps(page, indent=2)}')
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f'Returning {json_dumps(page, indent=2)}')
         return page, {'Content-Type': as2.CONTENT_TYPE_LD_PROFILE}
 
     ret = {
@@ -1225,7 +1248,8 @@ def follower_collection(id, collection):
     if count != 1001:
         ret['totalItems'] = count
 
-    logger.debug(f'Returning {json_dumps(collection, indent=2)}')
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f'Returning {json_dumps(collection, indent=2)}')
     return ret, {
         'Content-Type': as2.CONTENT_TYPE_LD_PROFILE,
     }
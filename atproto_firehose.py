@@ -206,9 +206,9 @@ def subscribe():
             # when running locally, comment out put above and uncomment this
             # cursor.updated = util.now().replace(tzinfo=None)
 
-        blocks = {}  # maps base32 str CID to dict block
-        if block_bytes := payload.get('blocks'):
-            _, blocks = libipld.decode_car(block_bytes)
+        # maps base32 str CID to dict block. decoded lazily, since most commits
+        # are from repos we don't care about.
+        blocks = None
 
         # detect records from bridged ATProto users that we should handle
         for p_op in payload.get('ops', []):
@@ -227,6 +227,17 @@ def subscribe():
                 commits.put(op)
                 continue
 
+            # the only records we want from non-ATProto users are follows of
+            # protocol bot users, so don't bother decoding blocks for anything else
+            if (op.repo not in atproto_dids
+                    and not op.path.startswith('app.bsky.graph.follow/')):
+                continue
+
+            if blocks is None:
+                blocks = {}
+                if block_bytes := payload.get('blocks'):
+                    _, blocks = libipld.decode_car(block_bytes)
+
             cid = p_op.get('cid')
             block = blocks.get(cid)
             # our own commits are sometimes missing the record
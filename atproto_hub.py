@@ -1,16 +1,21 @@
 """Single-instance hub for ATProto subscription (firehose) server and client."""
-from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+import hashlib
 from ipaddress import ip_address, ip_network
 import logging
 import os
 from pathlib import Path
-import socket
 import threading
 from threading import Thread, Timer
+import time
 
 import arroba.server
 from arroba import xrpc_sync
-from flask import Flask, render_template
+import cachetools
+import dns.exception
+import dns.resolver
+from flask import Flask, make_response, render_template, request
 import lexrpc.client
 import lexrpc.flask_server
 from oauth_dropins.webutil.appengine_info import DEBUG, LOCAL_SERVER
@@ -43,6 +48,15 @@ BSKY_TEAM_HOSTS = (
 # https://console.cloud.google.com/errors/detail/CJrBqKnRzPfNRA;time=PT1H;refresh=true;locations=global?project=bridgy-federated
 HANDLE_THREADS = 10
 
+# how long to cache reverse DNS lookups in gethostbyaddr. successful lookups
+# use their PTR record's TTL, capped at this max. failed lookups are cached for
+# less time so that we retry them sooner.
+GETHOSTBYADDR_MAX_CACHE_TTL = timedelta(minutes=15)
+GETHOSTBYADDR_NEGATIVE_CACHE_TTL = timedelta(seconds=60)
+
+dns_resolver = dns.resolver.Resolver()
+dns_resolver.lifetime = 5  # seconds
+
 logger = logging.getLogger(__name__)
 
 models.reset_protocol_properties()
@@ -88,27 +102,86 @@ def atproto_commit():
     return 'OK'
 
 
-@lru_cache
 def gethostbyaddr(addr):
-    """Wrapper for :func:`socket.gethostbyaddr` that caches the result."""
-    for subnet in BSKY_TEAM_CIDRS:
-        if ip_address(addr) in subnet:
-            return 'bsky'
+    """Returns an IP address's hostname, or None if it doesn't have one.
+
+    Looks up PTR records with dnspython instead of :func:`socket.gethostbyaddr`
+    so that we can cache them based on their TTL. Bluesky team IPs return
+    ``'bsky'``. Private, loopback, etc addresses aren't looked up at all.
+
+    Args:
+      addr (str): IPv4 or IPv6 address
+
+    Returns:
+      str or None:
+    """
+    host, _ = _gethostbyaddr(addr)
+    return host
+
+
+def _gethostbyaddr_ttu(addr, value, now):
+    """Time-to-use (expiration) for :func:`_gethostbyaddr` cache entries."""
+    _, ttl = value
+    return now + ttl
+
+
+@cachetools.cached(cachetools.TLRUCache(4096, _gethostbyaddr_ttu),
+                   lock=threading.Lock())
+def _gethostbyaddr(addr):
+    """Cached implementation of :func:`gethostbyaddr`.
+
+    Returns:
+      (str or None, int) tuple: hostname, seconds to cache it for
+    """
+    # parse once, not once per subnet
+    ip = ip_address(addr)
+    if any(ip in subnet for subnet in BSKY_TEAM_CIDRS):
+        return 'bsky', GETHOSTBYADDR_MAX_CACHE_TTL.total_seconds()
+    elif not ip.is_global:
+        return None, GETHOSTBYADDR_MAX_CACHE_TTL.total_seconds()
 
     try:
-        return socket.gethostbyaddr(addr)[0]
-    except socket.herror:
-        return None
+        answer = dns_resolver.resolve_address(addr)
+    except dns.exception.DNSException as e:
+        logger.info(f"Couldn't resolve PTR for {addr}: {e}")
+        return None, GETHOSTBYADDR_NEGATIVE_CACHE_TTL.total_seconds()
+
+    host = answer[0].target.to_text(omit_final_dot=True)
+    ttl = min(answer.rrset.ttl, GETHOSTBYADDR_MAX_CACHE_TTL.total_seconds())
+    return host, ttl
 
 
 @app.get('/admin/atproto')
 def atproto_admin():
-    return render_template(
+    subscribers = lexrpc.flask_server.subscribers
+
+    # the subscriber list changes slowly, and we poll this page, so skip
+    # resolving and rendering entirely if it hasn't changed. include a time
+    # bucket so that hostnames get re-resolved, eg after a DNS failure.
+    state = sorted((nsid, s.ip, s.user_agent, repr(s.args), s.start.isoformat())
+                   for nsid, subs in subscribers.items() for s in subs)
+    bucket = int(time.time() // GETHOSTBYADDR_MAX_CACHE_TTL.total_seconds())
+    etag = hashlib.blake2b(repr((state, bucket)).encode(),
+                           digest_size=8).hexdigest()
+    if request.if_none_match.contains_weak(etag):
+        resp = make_response('', 304)
+        resp.set_etag(etag, weak=True)
+        return resp
+
+    # resolve all subscribers' hostnames in parallel up front instead of one at
+    # a time while rendering
+    addrs = list({s.ip for subs in subscribers.values() for s in subs})
+    with ThreadPoolExecutor(max_workers=32) as executor:
+        hosts = dict(zip(addrs, executor.map(gethostbyaddr, addrs)))
+
+    resp = make_response(render_template(
         'atproto.html',
-        subscribers=lexrpc.flask_server.subscribers,
-        gethostbyaddr=gethostbyaddr,
+        subscribers=subscribers,
+        gethostbyaddr=hosts.get,
         pytz=pytz,
-    )
+    ))
+    resp.set_etag(etag, weak=True)
+    return resp
 
 
 
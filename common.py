@@ -1,5 +1,7 @@
 """Misc common utilities."""
 import base64
+from concurrent.futures import ThreadPoolExecutor
+import contextlib
 from datetime import timedelta
 import functools
 import logging
@@ -11,7 +13,14 @@ from urllib.parse import urljoin, urlparse
 
 import cachetools
 from Crypto.Util import number
-from flask import abort, g, has_request_context, make_response, request
+from flask import (
+    abort,
+    copy_current_request_context,
+    g,
+    has_request_context,
+    make_response,
+    request,
+)
 from google.cloud.error_reporting.util import build_flask_context
 from google.cloud import ndb
 from google.cloud.ndb.global_cache import _InProcessGlobalCache, MemcacheCache
@@ -27,6 +36,8 @@ from oauth_dropins.webutil.util import json_dumps
 from negotiator import ContentNegotiator, AcceptParameters, ContentType
 import pymemcache.client.base
 from pymemcache.test.utils import MockMemcacheClient
+import requests
+from urllib3.exceptions import NewConnectionError
 
 logger = logging.getLogger(__name__)
 
@@ -64,6 +75,9 @@ LOCAL_DOMAINS = (
   'my.dev.com:8080',
 )
 DOMAINS = (PRIMARY_DOMAIN,) + PROTOCOL_DOMAINS + OTHER_DOMAINS + LOCAL_DOMAINS
+# for fast membership checks in hot paths, eg unwrap
+_DOMAINS_SET = frozenset(DOMAINS)
+_DOMAINS_OR_EMPTY_SET = _DOMAINS_SET | {''}
 # TODO: unify with manual_opt_out
 # TODO: unify with Bridgy's
 DOMAIN_BLOCKLIST = (
@@ -111,6 +125,15 @@ else:
         allow_unicode_keys=True)
     global_cache = MemcacheCache(memcache)
 
+# maps domain to (number of consecutive connect failures, last failure message).
+# used by fail_fast to short circuit requests to domains that are currently down.
+# the TTL is well under the send queue's min_backoff_seconds so that a retried
+# task doesn't land inside the same window.
+DOMAIN_FAILURE_THRESHOLD = 3
+DOMAIN_FAILURE_TTL = timedelta(seconds=60)
+domain_failures = cachetools.TTLCache(10000, DOMAIN_FAILURE_TTL.total_seconds())
+domain_failures_lock = threading.Lock()
+
 _negotiator = ContentNegotiator(acceptable=[
     AcceptParameters(ContentType(CONTENT_TYPE_HTML)),
     AcceptParameters(ContentType(as2.CONTENT_TYPE)),
@@ -260,8 +283,8 @@ def unwrap(val, field=None):
         # TODO: clean up. https://github.com/snarfed/bridgy-fed/issues/967
         id = val.get('id')
         if (isinstance(id, str)
-                and urlparse(id).path.strip('/') in DOMAINS + ('',)
-                and util.domain_from_link(id) in DOMAINS):
+                and urlparse(id).path.strip('/') in _DOMAINS_OR_EMPTY_SET
+                and util.domain_from_link(id) in _DOMAINS_SET):
             # protocol bot user, don't touch its URLs
             return {**val, 'id': unwrap(id)}
 
@@ -376,6 +399,94 @@ def create_task(queue, delay=None, **params):
     return msg, 202
 
 
+def create_tasks(queue, tasks, max_workers=20):
+    """Adds multiple Cloud Tasks tasks to the same queue in parallel.
+
+    Each task is a separate Cloud Tasks API call, so for large batches, eg
+    delivering to many followers, this overlaps them in a thread pool. If
+    running tasks inline, creates them serially, in order, instead.
+
+    Args:
+      queue (str): queue name
+      tasks (sequence of dict): params for each task, passed through to
+        :func:`create_task`
+      max_workers (int): maximum number of tasks to create concurrently
+    """
+    if RUN_TASKS_INLINE or appengine_info.LOCAL_SERVER or len(tasks) <= 1:
+        for params in tasks:
+            create_task(queue=queue, **params)
+        return
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # create_task reads the current request's traceparent header
+        futures = [executor.submit(copy_current_request_context(create_task),
+                                   queue=queue, **params)
+                   for params in tasks]
+
+    for future in futures:
+        future.result()  # propagate exceptions
+
+
+@contextlib.contextmanager
+def fail_fast(domain):
+    """Context manager that short circuits requests to domains that are down.
+
+    If requests to ``domain`` inside this context manager have failed to connect
+    :const:`DOMAIN_FAILURE_THRESHOLD` times in a row, with the last one within
+    :const:`DOMAIN_FAILURE_TTL`, raises :class:`requests.ConnectionError`
+    immediately instead of running the block. Only connect failures count, eg
+    connect timeouts, refused connections, and DNS failures. Anything else, eg
+    read timeouts or connections reset mid-response, resets the count.
+
+    Args:
+      domain (str)
+    """
+    with domain_failures_lock:
+        failures, msg = domain_failures.get(domain, (0, None))
+    if failures >= DOMAIN_FAILURE_THRESHOLD:
+        logger.info(f'{domain} failed to connect {failures} times recently, not retrying yet: {msg}')
+        raise requests.ConnectionError(f'{domain} failed recently: {msg}')
+
+    try:
+        yield
+    except BaseException as e:
+        with domain_failures_lock:
+            if is_connect_failure(e):
+                failures, _ = domain_failures.get(domain, (0, None))
+                domain_failures[domain] = (failures + 1, str(e))
+            else:
+                domain_failures.pop(domain, None)
+        raise
+    else:
+        with domain_failures_lock:
+            domain_failures.pop(domain, None)
+
+
+def is_connect_failure(e):
+    """Returns True if an exception is from failing to connect to a server.
+
+    Includes connect timeouts, refused connections, and DNS failures. Doesn't
+    include read timeouts, connections reset after connecting, or SSL or proxy
+    errors.
+
+    Args:
+      e (BaseException)
+
+    Returns:
+      bool:
+    """
+    if isinstance(e, requests.ConnectTimeout):
+        return True
+    elif (not isinstance(e, requests.ConnectionError)
+          or isinstance(e, (requests.exceptions.SSLError,
+                            requests.exceptions.ProxyError))):
+        return False
+
+    # requests wraps urllib3's MaxRetryError, whose reason is the underlying error
+    reason = getattr(e.args[0], 'reason', None) if e.args else None
+    return isinstance(reason, NewConnectionError)
+
+
 def report_exception(**kwargs):
     return report_error(msg=None, exception=True, **kwargs)
 
@@ -9,6 +9,7 @@ from urllib.parse import urljoin, urlparse
 
 from cachetools import cached, LRUCache
 from flask import request
+from google.api_core.exceptions import FailedPrecondition
 from google.cloud import ndb
 from google.cloud.ndb import OR
 from google.cloud.ndb.model import _entity_to_protobuf
@@ -1230,7 +1231,8 @@ class Protocol:
                     **obj.as1,
                 },
             }
-            logger.debug(f'  AS1: {json_dumps(update_as1, indent=2)}')
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f'  AS1: {json_dumps(update_as1, indent=2)}')
             return Object(id=id, our_as1=update_as1,
                           source_protocol=obj.source_protocol)
 
@@ -1252,7 +1254,8 @@ class Protocol:
                 'published': now,
             }
             logger.info(f'Wrapping in post')
-            logger.debug(f'  AS1: {json_dumps(create_as1, indent=2)}')
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f'  AS1: {json_dumps(create_as1, indent=2)}')
             return Object.get_or_create(create_id, our_as1=create_as1,
                                         source_protocol=obj.source_protocol,
                                         authed_as=authed_as)
@@ -1296,13 +1299,20 @@ class Protocol:
 
         # enqueue send task for each targets
         user = from_user.key.urlsafe()
-        for i, (target, orig_obj) in enumerate(sorted_targets):
+        tasks = []
+        for target, orig_obj in sorted_targets:
             if to_proto and target.protocol != to_proto.LABEL:
                 continue
             orig_obj_id = orig_obj.key.id() if orig_obj else ''
-            common.create_task(queue='send', obj_id=obj.key.id(),
-                               url=target.uri, protocol=target.protocol,
-                               orig_obj_id=orig_obj_id, user=user)
+            tasks.append({
+                'obj_id': obj.key.id(),
+                'url': target.uri,
+                'protocol': target.protocol,
+                'orig_obj_id': orig_obj_id,
+                'user': user,
+            })
+
+        common.create_tasks(queue='send', tasks=tasks)
 
         return 'OK', 202
 
@@ -1323,18 +1333,39 @@ class Protocol:
         """
         logger.debug('Finding recipients and their targets')
 
-        target_uris = sorted(set(as1.targets(obj.as1)))
+        # Object.as1 and Object.type convert from the source format on every
+        # access, so do it once up front
+        obj_as1 = obj.as1
+        obj_type = as1.object_type(obj_as1)
+
+        target_uris = sorted(set(as1.targets(obj_as1)))
         logger.info(f'Raw targets: {target_uris}')
         orig_obj = None
         targets = {}  # maps Target to Object or None
-        owner = as1.get_owner(obj.as1)
-        allow_opt_out = (obj.type == 'delete')
-        inner_obj_as1 = as1.get_object(obj.as1)
+        owner = as1.get_owner(obj_as1)
+        allow_opt_out = (obj_type == 'delete')
+        inner_obj_as1 = as1.get_object(obj_as1)
         inner_obj_id = inner_obj_as1.get('id')
         in_reply_tos = as1.get_ids(inner_obj_as1, 'inReplyTo')
-        is_reply = obj.type == 'comment' or in_reply_tos
+        is_reply = obj_type == 'comment' or in_reply_tos
         is_self_reply = False
 
+        def query_followers_async(user_key):
+            # only project from_ since that's all we need. skips loading and
+            # deserializing the rest of each Follower entity.
+            return Follower.query(Follower.to == user_key,
+                                  Follower.status == 'active',
+                                  ).fetch_async(projection=[Follower.from_])
+
+        # start the followers query now so that it runs in the background while
+        # we load direct targets below. self replies also go to followers, but
+        # we don't know yet whether this is one, so we query for them later.
+        user_key = from_cls.actor_key(obj, allow_opt_out=allow_opt_out)
+        followers_future = None
+        if (user_key and not is_reply
+                and obj_type in ('post', 'update', 'delete', 'share')):
+            followers_future = query_followers_async(user_key)
+
         if is_reply:
             original_ids = in_reply_tos
         else:
@@ -1347,7 +1378,7 @@ class Protocol:
         for label in (list(from_user.DEFAULT_ENABLED_PROTOCOLS)
                       + from_user.enabled_protocols):
             proto = PROTOCOLS[label]
-            if proto.HAS_COPIES and (obj.type in ('update', 'delete', 'share', 'undo')
+            if proto.HAS_COPIES and (obj_type in ('update', 'delete', 'share', 'undo')
                                      or is_reply):
                 for id in original_ids:
                     if Protocol.for_id(id) == proto:
@@ -1420,14 +1451,14 @@ Hi! You <a href="{inner_obj_as1.get('url') or inner_obj_id}">recently replied</a
             # only use orig_obj for inReplyTos and repost objects
             # https://github.com/snarfed/bridgy-fed/issues/1237
             targets[Target(protocol=target_proto.LABEL, uri=target)] = (
-                orig_obj if id in in_reply_tos or id in as1.get_ids(obj.as1, 'object')
+                orig_obj if id in in_reply_tos or id in as1.get_ids(obj_as1, 'object')
                 else None)
 
             if target_author_key:
                 logger.debug(f'Recipient is {target_author_key}')
                 obj.add('notify', target_author_key)
 
-        if obj.type == 'undo':
+        if obj_type == 'undo':
             logger.debug('Object is an undo; adding targets for inner object')
             if set(inner_obj_as1.keys()) == {'id'}:
                 inner_obj = from_cls.load(inner_obj_id, raise_=False)
@@ -1440,18 +1471,26 @@ Hi! You <a href="{inner_obj_as1.get('url') or inner_obj_id}">recently replied</a
         logger.info(f'Direct targets: {[t.uri for t in targets.keys()]}')
 
         # deliver to followers, if appropriate
-        user_key = from_cls.actor_key(obj, allow_opt_out=allow_opt_out)
         if not user_key:
             logger.info("Can't tell who this is from! Skipping followers.")
             return targets
 
         followers = []
-        if (obj.type in ('post', 'update', 'delete', 'share')
+        if (obj_type in ('post', 'update', 'delete', 'share')
                 and (not is_reply or is_self_reply)):
             logger.info(f'Delivering to followers of {user_key}')
+            if not followers_future:
+                followers_future = query_followers_async(user_key)
+            try:
+                all_followers = followers_future.get_result()
+            except FailedPrecondition as e:
+                # the projection query's composite index may still be building,
+                # eg right after deploying it. fall back to a full query.
+                logger.warning(f'Follower projection query failed, falling back to full query: {e}')
+                all_followers = Follower.query(Follower.to == user_key,
+                                               Follower.status == 'active').fetch()
             followers = [
-                f for f in Follower.query(Follower.to == user_key,
-                                          Follower.status == 'active')
+                f for f in all_followers
                 # skip protocol bot users
                 if not Protocol.for_bridgy_subdomain(f.from_.id())
                 # skip protocols this user hasn't enabled, or where the base
@@ -1472,17 +1511,21 @@ Hi! You <a href="{inner_obj_as1.get('url') or inner_obj_id}">recently replied</a
             # which object should we add to followers' feeds, if any
             feed_obj = None
             if not internal:
-                if obj.type == 'share':
+                if obj_type == 'share':
                     feed_obj = obj
-                elif obj.type not in ('delete', 'undo', 'stop-following'):
-                    inner = as1.get_object(obj.as1)
+                elif obj_type not in ('delete', 'undo', 'stop-following'):
+                    inner = as1.get_object(obj_as1)
                     # don't add profile updates to feeds
-                    if not (obj.type == 'update'
+                    if not (obj_type == 'update'
                             and inner.get('objectType') in as1.ACTOR_TYPES):
                         inner_id = inner.get('id')
                         if inner_id:
                             feed_obj = from_cls.load(inner_id, raise_=False)
 
+            # load the reposted object once, not per follower
+            share_obj = (Object.get_by_id(inner_obj_id)
+                         if users and obj_type == 'share' else None)
+
             for user in users:
                 if feed_obj:
                     feed_obj.add('feed', user.key)
@@ -1499,8 +1542,7 @@ Hi! You <a href="{inner_obj_as1.get('url') or inner_obj_id}">recently replied</a
                 # https://atproto.com/specs/did#did-documents
                 target = util.dedupe_urls([target], trailing_slash=False)[0]
 
-                targets[Target(protocol=user.LABEL, uri=target)] = \
-                    Object.get_by_id(inner_obj_id) if obj.type == 'share' else None
+                targets[Target(protocol=user.LABEL, uri=target)] = share_obj
 
             if feed_obj:
                 feed_obj.put()
@@ -1509,7 +1551,7 @@ Hi! You <a href="{inner_obj_as1.get('url') or inner_obj_id}">recently replied</a
         # TODO: abstract for other protocols
         from atproto import ATProto
         if (ATProto in to_protocols
-                and obj.type in ('post', 'update', 'delete', 'share')):
+                and obj_type in ('post', 'update', 'delete', 'share')):
             logger.info(f'user has ATProto enabled, adding {ATProto.PDS_URL}')
             targets.setdefault(
                 Target(protocol=ATProto.LABEL, uri=ATProto.PDS_URL), None)
@@ -1521,7 +1563,7 @@ Hi! You <a href="{inner_obj_as1.get('url') or inner_obj_id}">recently replied</a
         targets = {}
         source_domains = [
             util.domain_from_link(url) for url in
-            (obj.as1.get('id'), obj.as1.get('url'), as1.get_owner(obj.as1))
+            (obj_as1.get('id'), obj_as1.get('url'), as1.get_owner(obj_as1))
             if util.is_web(url)
         ]
         for url in sorted(util.dedupe_urls(
@@ -1769,7 +1811,8 @@ def send_task():
         delay_s = int((util.now().replace(tzinfo=None) - obj.created).total_seconds())
         delay = f'({delay_s} s behind)'
     logger.info(f'Sending {obj.source_protocol} {obj.type} {obj.key.id()} to {protocol} {url} {delay}')
-    logger.debug(f'  AS1: {json_dumps(obj.as1, indent=2)}')
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f'  AS1: {json_dumps(obj.as1, indent=2)}')
     sent = None
     try:
         sent = PROTOCOLS[protocol].send(obj, url, from_user=user,
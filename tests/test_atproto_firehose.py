@@ -194,6 +194,11 @@ class ATProtoFirehoseSubscribeTest(ATProtoTestCase):
     def test_post_by_other(self):
         self.assert_doesnt_enqueue(POST_BSKY, repo='did:plc:bob')
 
+    def test_post_by_other_doesnt_decode_blocks(self):
+        with patch('libipld.decode_car') as mock_decode_car:
+            self.assert_doesnt_enqueue(POST_BSKY, repo='did:plc:bob')
+        mock_decode_car.assert_not_called()
+
     def test_skip_post_by_bridged_user(self):
         # reply to bridged user, but also from bridged user, so we should skip
         self.assert_doesnt_enqueue({
@@ -315,7 +320,7 @@ class ATProtoFirehoseSubscribeTest(ATProtoTestCase):
         self.assert_enqueues({
             '$type': 'app.bsky.graph.follow',
             'subject': 'did:fa',
-        })
+        }, path='app.bsky.graph.follow/abc123')
 
     def test_block_of_our_user(self):
         self.assert_enqueues({
@@ -0,0 +1,156 @@
+"""Unit tests for atproto_hub.py."""
+from datetime import timedelta
+import time
+from unittest.mock import MagicMock, patch
+
+import dns.name
+import dns.resolver
+import lexrpc.flask_server
+from lexrpc.flask_server import Subscriber
+from oauth_dropins.webutil.testutil import NOW
+
+from .testutil import TestCase
+
+import atproto_hub
+from atproto_hub import (
+    gethostbyaddr,
+    GETHOSTBYADDR_MAX_CACHE_TTL,
+    GETHOSTBYADDR_NEGATIVE_CACHE_TTL,
+)
+
+SUBSCRIBE_REPOS = 'com.atproto.sync.subscribeRepos'
+
+
+def ptr_answer(host, ttl):
+    """Returns a mock dnspython PTR answer."""
+    answer = MagicMock()
+    answer.rrset.ttl = ttl
+    answer.__getitem__.return_value.target = dns.name.from_text(host)
+    return answer
+
+
+@patch.object(atproto_hub.dns_resolver, 'resolve_address')
+class GethostbyaddrTest(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        atproto_hub._gethostbyaddr.cache.clear()
+
+    def expire(self, delta):
+        """Expires cache entries as of ``delta`` from now."""
+        atproto_hub._gethostbyaddr.cache.expire(
+            time.monotonic() + delta.total_seconds())
+
+    def test_ttl_capped(self, mock_resolve):
+        mock_resolve.return_value = ptr_answer('foo.example.com', 86400)
+
+        self.assertEqual('foo.example.com', gethostbyaddr('8.8.8.8'))
+        self.assertEqual(('foo.example.com', GETHOSTBYADDR_MAX_CACHE_TTL.total_seconds()),
+                         atproto_hub._gethostbyaddr('8.8.8.8'))
+        mock_resolve.assert_called_once_with('8.8.8.8')
+
+        self.expire(GETHOSTBYADDR_MAX_CACHE_TTL + timedelta(seconds=1))
+        self.assertEqual('foo.example.com', gethostbyaddr('8.8.8.8'))
+        self.assertEqual(2, mock_resolve.call_count)
+
+    def test_short_ttl(self, mock_resolve):
+        mock_resolve.return_value = ptr_answer('foo.example.com', 30)
+
+        self.assertEqual('foo.example.com', gethostbyaddr('8.8.8.8'))
+        self.expire(timedelta(seconds=29))
+        self.assertEqual('foo.example.com', gethostbyaddr('8.8.8.8'))
+        self.assertEqual(1, mock_resolve.call_count)
+
+        self.expire(timedelta(seconds=31))
+        self.assertEqual('foo.example.com', gethostbyaddr('8.8.8.8'))
+        self.assertEqual(2, mock_resolve.call_count)
+
+    def test_dns_error_retried_after_negative_ttl(self, mock_resolve):
+        mock_resolve.side_effect = dns.resolver.NXDOMAIN()
+
+        self.assertIsNone(gethostbyaddr('8.8.8.8'))
+        self.assertIsNone(gethostbyaddr('8.8.8.8'))
+        self.assertEqual(1, mock_resolve.call_count)
+
+        mock_resolve.side_effect = None
+        mock_resolve.return_value = ptr_answer('foo.example.com', 3600)
+        self.expire(GETHOSTBYADDR_NEGATIVE_CACHE_TTL + timedelta(seconds=1))
+        self.assertEqual('foo.example.com', gethostbyaddr('8.8.8.8'))
+        self.assertEqual(2, mock_resolve.call_count)
+
+    def test_non_global_not_resolved(self, mock_resolve):
+        for addr in '10.0.0.1', '192.168.1.2', '127.0.0.1', '::1':
+            with self.subTest(addr=addr):
+                self.assertIsNone(gethostbyaddr(addr))
+
+        mock_resolve.assert_not_called()
+
+    def test_bsky_team(self, mock_resolve):
+        for addr in '209.249.133.121', '108.179.139.5', '67.213.161.33':
+            with self.subTest(addr=addr):
+                self.assertEqual('bsky', gethostbyaddr(addr))
+
+        mock_resolve.assert_not_called()
+
+
+@patch('atproto_hub.gethostbyaddr', return_value='foo.example.com')
+class AdminTest(TestCase):
+
+    def setUp(self):
+        super().setUp()
+        lexrpc.flask_server.subscribers.clear()
+        self.hub_client = atproto_hub.app.test_client()
+
+    def tearDown(self):
+        lexrpc.flask_server.subscribers.clear()
+        super().tearDown()
+
+    def add_subscriber(self, ip):
+        lexrpc.flask_server.subscribers[SUBSCRIBE_REPOS].append(Subscriber(
+            ip=ip, user_agent='Mozilla', args={'cursor': 123}, start=NOW))
+
+    def get(self, etag=None):
+        headers = {'If-None-Match': etag} if etag else {}
+        return self.hub_client.get('/admin/atproto', headers=headers)
+
+    def test_etag(self, mock_gethostbyaddr):
+        self.add_subscriber('8.8.8.8')
+
+        with patch('time.time', return_value=1000):
+            resp = self.get()
+            self.assertEqual(200, resp.status_code)
+            self.assertIn('foo.example.com', resp.get_data(as_text=True))
+            etag = resp.headers['ETag']
+            self.assertTrue(etag.startswith('W/'), etag)
+            mock_gethostbyaddr.assert_called_once_with('8.8.8.8')
+
+            mock_gethostbyaddr.reset_mock()
+            resp = self.get(etag=etag)
+            self.assertEqual(304, resp.status_code)
+            self.assertEqual(etag, resp.headers['ETag'])
+            mock_gethostbyaddr.assert_not_called()
+
+    def test_etag_changes_with_subscribers(self, mock_gethostbyaddr):
+        self.add_subscriber('8.8.8.8')
+
+        with patch('time.time', return_value=1000):
+            etag = self.get().headers['ETag']
+
+            self.add_subscriber('9.9.9.9')
+            resp = self.get(etag=etag)
+            self.assertEqual(200, resp.status_code)
+            self.assertNotEqual(etag, resp.headers['ETag'])
+
+    def test_etag_changes_with_time_bucket(self, mock_gethostbyaddr):
+        self.add_subscriber('8.8.8.8')
+
+        with patch('time.time', return_value=1000):
+            etag = self.get().headers['ETag']
+
+        later = 1000 + GETHOSTBYADDR_MAX_CACHE_TTL.total_seconds()
+        mock_gethostbyaddr.reset_mock()
+        with patch('time.time', return_value=later):
+            resp = self.get(etag=etag)
+            self.assertEqual(200, resp.status_code)
+            self.assertNotEqual(etag, resp.headers['ETag'])
+            mock_gethostbyaddr.assert_called_once_with('8.8.8.8')
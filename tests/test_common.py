@@ -4,6 +4,8 @@ from unittest.mock import Mock, patch
 import flask
 from granary import as2
 from oauth_dropins.webutil.appengine_config import error_reporting_client
+import requests
+from urllib3.exceptions import MaxRetryError, NewConnectionError, ProtocolError
 
 # import first so that Fake is defined before URL routes are registered
 from .testutil import ExplicitFake, Fake, OtherFake, TestCase
@@ -189,3 +191,86 @@ class CommonTest(TestCase):
                   app.test_request_context('/', headers={'Accept': accept})):
                 self.assertEqual(expected, common.as2_request_type())
 
+    @patch('oauth_dropins.webutil.appengine_config.tasks_client.create_task')
+    def test_create_tasks(self, mock_create_task):
+        common.RUN_TASKS_INLINE = False
+
+        common.create_tasks(queue='send', tasks=[
+            {'url': 'http://a.com/inbox', 'obj_id': 'x'},
+            {'url': 'http://b.com/inbox', 'obj_id': 'x'},
+            {'url': 'http://c.com/inbox', 'obj_id': 'x'},
+        ])
+
+        self.assertEqual(3, mock_create_task.call_count)
+        for url in 'http://a.com/inbox', 'http://b.com/inbox', 'http://c.com/inbox':
+            self.assert_task(mock_create_task, 'send', url=url, obj_id='x')
+
+    def test_fail_fast(self):
+        def refused():
+            return requests.ConnectionError(MaxRetryError(
+                None, 'https://down.com/', NewConnectionError(None, 'refused')))
+
+        for _ in range(common.DOMAIN_FAILURE_THRESHOLD):
+            with self.assertRaises(requests.ConnectionError):
+                with common.fail_fast('down.com'):
+                    raise refused()
+
+        # short circuits without running the block, with a new exception each time
+        ran = False
+        with self.assertRaises(requests.ConnectionError) as first:
+            with common.fail_fast('down.com'):
+                ran = True
+        self.assertFalse(ran)
+        with self.assertRaises(requests.ConnectionError) as second:
+            with common.fail_fast('down.com'):
+                pass
+        self.assertIsNot(first.exception, second.exception)
+
+        # other domains and other errors are unaffected
+        with common.fail_fast('up.com'):
+            ran = True
+        self.assertTrue(ran)
+
+        for _ in range(common.DOMAIN_FAILURE_THRESHOLD):
+            with self.assertRaises(ValueError):
+                with common.fail_fast('bad.com'):
+                    raise ValueError('foo')
+        with common.fail_fast('bad.com'):
+            pass
+
+    def test_fail_fast_needs_consecutive_connect_failures(self):
+        refused = requests.ConnectionError(MaxRetryError(
+            None, 'https://flaky.com/', NewConnectionError(None, 'refused')))
+
+        for _ in range(common.DOMAIN_FAILURE_THRESHOLD - 1):
+            with self.assertRaises(requests.ConnectionError):
+                with common.fail_fast('flaky.com'):
+                    raise refused
+
+        # a success resets the count
+        with common.fail_fast('flaky.com'):
+            pass
+        with self.assertRaises(requests.ConnectionError):
+            with common.fail_fast('flaky.com'):
+                raise refused
+        with common.fail_fast('flaky.com'):
+            pass
+
+    def test_fail_fast_ignores_non_connect_failures(self):
+        for err in (
+            requests.ConnectionError(ProtocolError(
+                'Connection aborted.', ConnectionResetError('reset'))),
+            requests.ReadTimeout('foo'),
+            requests.exceptions.SSLError('foo'),
+        ):
+            with self.subTest(err=err):
+                for _ in range(common.DOMAIN_FAILURE_THRESHOLD):
+                    with self.assertRaises(type(err)):
+                        with common.fail_fast('reset.com'):
+                            raise err
+
+                # not blocked
+                with common.fail_fast('reset.com'):
+                    pass
+
+        self.assertTrue(common.is_connect_failure(requests.ConnectTimeout('foo')))
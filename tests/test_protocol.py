@@ -7,6 +7,7 @@ from unittest import skip
 from unittest.mock import ANY, patch
 
 from arroba.tests.testutil import dns_answer
+from google.api_core.exceptions import FailedPrecondition
 from google.cloud import ndb
 from google.cloud.ndb.global_cache import _InProcessGlobalCache
 from granary import as2
@@ -982,6 +983,33 @@ class ProtocolReceiveTest(TestCase):
             ('other:bob:target', obj.as1),
         ], OtherFake.sent)
 
+    def test_create_post_followers_index_missing_falls_back(self):
+        self.make_followers()
+
+        # simulate the projection query's composite index still building
+        orig_fetch_async = ndb.Query.fetch_async
+        def fetch_async(query, *args, **kwargs):
+            if kwargs.get('projection'):
+                future = ndb.tasklets.Future()
+                future.set_exception(FailedPrecondition('no matching index found'))
+                return future
+            return orig_fetch_async(query, *args, **kwargs)
+
+        with patch.object(ndb.Query, 'fetch_async', fetch_async):
+            self.assertEqual(('OK', 202), Fake.receive_as1({
+                'id': 'fake:create',
+                'objectType': 'activity',
+                'verb': 'post',
+                'actor': 'fake:user',
+                'object': {
+                    'id': 'fake:post',
+                    'objectType': 'note',
+                },
+            }))
+
+        self.assertEqual(['other:alice:target', 'other:bob:target'],
+                         [target for target, _ in OtherFake.sent])
+
     def test_create_post_bare_object(self):
         self.make_followers()
 
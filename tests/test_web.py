@@ -5,6 +5,7 @@ from unittest.mock import ANY, patch
 
 import arroba.server
 from arroba.util import at_uri
+import flask
 from flask import get_flashed_messages
 from google.cloud import ndb
 from granary import as1, as2, atom, microformats2, rss
@@ -3077,6 +3078,31 @@ class WebUtilTest(TestCase):
         self.assert_equals({**REPOST_MF2, 'url': 'http://new/url'}, obj.mf2)
         self.assertIsNone(Object.get_by_id('http://new/url'))
 
+    def test_fetch_author_mf2_budget(self, mock_get, __):
+        mock_get.return_value = ACTOR
+        flask.request.environ[web.AUTHOR_MF2_ENVIRON_KEY] = {}
+
+        for i in range(web.AUTHORSHIP_FETCH_BUDGET):
+            self.assertTrue(web.fetch_author_mf2(f'https://user.com/{i}')['items'])
+
+        self.assertEqual({'items': [], 'rels': {}, 'rel-urls': {}},
+                         web.fetch_author_mf2('https://user.com/more'))
+        self.assertEqual(web.AUTHORSHIP_FETCH_BUDGET, mock_get.call_count)
+
+    def test_fetch_author_mf2_budget_repeated_url(self, mock_get, __):
+        mock_get.return_value = ACTOR
+        flask.request.environ[web.AUTHOR_MF2_ENVIRON_KEY] = {}
+
+        # repeated fetches of the same URL are memoized and don't spend the budget
+        for _ in range(web.AUTHORSHIP_FETCH_BUDGET + 2):
+            self.assertTrue(web.fetch_author_mf2('https://user.com/')['items'])
+        self.assertEqual(1, mock_get.call_count)
+
+        for i in range(web.AUTHORSHIP_FETCH_BUDGET - 1):
+            self.assertTrue(web.fetch_author_mf2(f'https://user.com/{i}')['items'])
+        self.assertEqual({'items': [], 'rels': {}, 'rel-urls': {}},
+                         web.fetch_author_mf2('https://user.com/more'))
+
     def test_fetch_error(self, mock_get, __):
         mock_get.return_value = requests_response(REPOST_HTML, status=405)
         with self.assertRaises(BadGateway):
@@ -179,6 +179,17 @@ class WebfingerTest(TestCase):
                 self.assertEqual('application/jrd+json', got.headers['Content-Type'])
                 self.assert_equals(WEBFINGER, got.json)
 
+    def test_webfinger_cached(self):
+        url = '/.well-known/webfinger?resource=acct:user.com@user.com'
+        got = self.client.get(url, headers={'Accept': 'application/json'})
+        self.assertEqual(200, got.status_code, got.get_data(as_text=True))
+
+        # second request should be served from cache, without loading the user
+        self.user.key.delete()
+        got = self.client.get(url, headers={'Accept': 'application/json'})
+        self.assertEqual(200, got.status_code, got.get_data(as_text=True))
+        self.assert_equals(WEBFINGER, got.json)
+
     def test_webfinger_web_subdomain_redirects(self):
         path = '/.well-known/webfinger?resource=user.com@user.com'
 
@@ -451,3 +462,16 @@ class WebfingerTest(TestCase):
         self.assertIsNone(fetch_actor_url('@foo@bar'))
         self.assert_req(mock_get,
                         'https://bar/.well-known/webfinger?resource=acct:foo@bar')
+
+    @patch('requests.get', return_value=requests_response(
+        WEBFINGER, content_type='application/jrd+json'))
+    def test_fetch_cached(self, mock_get):
+        self.assertEqual(WEBFINGER, fetch('@foo@bar'))
+        self.assertEqual(WEBFINGER, fetch('@foo@bar'))
+        self.assertEqual(1, mock_get.call_count)
+
+    @patch('requests.get', return_value=requests_response(status=404))
+    def test_fetch_error_cached(self, mock_get):
+        self.assertIsNone(fetch('@foo@bar'))
+        self.assertIsNone(fetch('@foo@bar'))
+        self.assertEqual(1, mock_get.call_count)
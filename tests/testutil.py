@@ -264,6 +264,7 @@ from common import (
     PROTOCOL_DOMAINS,
 )
 from web import Web
+import webfinger
 from flask_app import app
 
 ActivityPub.DEFAULT_ENABLED_PROTOCOLS += ('fake', 'other')
@@ -298,6 +299,9 @@ class TestCase(unittest.TestCase, testutil.Asserts):
         protocol.Protocol.for_handle.cache.clear()
         User.count_followers.cache.clear()
         common.protocol_user_copy_ids.cache_clear()
+        common.domain_failures.clear()
+        webfinger._fetch.cache.clear()
+        webfinger.webfinger_cache.clear()
 
         for cls in ExplicitFake, Fake, OtherFake:
             cls.fetchable = {}
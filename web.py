@@ -1,4 +1,5 @@
 """Webmention protocol with microformats2 in HTML, aka the IndieWeb stack."""
+import copy
 from datetime import timedelta, timezone
 import difflib
 import logging
@@ -9,7 +10,7 @@ from urllib.parse import quote, urlencode, urljoin, urlparse
 from xml.etree import ElementTree
 
 import brevity
-from flask import redirect, render_template, request
+from flask import has_request_context, redirect, render_template, request
 from google.cloud import ndb
 from google.cloud.ndb import ComputedProperty
 from granary import as1, as2, atom, microformats2, rss
@@ -60,6 +61,11 @@ MAX_FEED_ITEMS_PER_POLL = 10
 # populated into Web.redirects_error
 OWNS_WEBFINGER = 'This site serves its own Webfinger, and likely ActivityPub too.'
 
+# max author pages to fetch for the authorship algorithm per webmention, and
+# request.environ key for fetch_author_mf2's per-request cache of them
+AUTHORSHIP_FETCH_BUDGET = 3
+AUTHOR_MF2_ENVIRON_KEY = 'bridgy_fed.author_mf2'
+
 # in addition to common.DOMAIN_BLOCKLIST
 FETCH_BLOCKLIST = (
     'bsky.app',
@@ -92,6 +98,39 @@ def is_valid_domain(domain, allow_internal=True):
     return True
 
 
+def fetch_author_mf2(url):
+    """``fetch_mf2_func`` for :func:`mf2util.find_author`, with a fetch budget.
+
+    In requests that have opted in by setting ``AUTHOR_MF2_ENVIRON_KEY`` in
+    their WSGI environ, eg :func:`webmention_task`, fetches at most
+    :const:`AUTHORSHIP_FETCH_BUDGET` distinct author pages, so that source
+    pages with lots of author links can't make us fetch arbitrarily many URLs.
+    Repeated URLs are served from that per-request cache and don't count
+    against the budget. Once the budget is spent, returns empty mf2.
+
+    Args:
+      url (str)
+
+    Returns:
+      dict: parsed mf2, or None
+    """
+    cache = (request.environ.get(AUTHOR_MF2_ENVIRON_KEY)
+             if has_request_context() else None)
+    if cache is None:
+        return util.fetch_mf2(url)
+
+    if url in cache:
+        logger.debug(f'Reusing author mf2 already fetched in this request for {url}')
+    elif len(cache) >= AUTHORSHIP_FETCH_BUDGET:
+        logger.info(f'Out of authorship fetch budget, not fetching {url}')
+        return {'items': [], 'rels': {}, 'rel-urls': {}}
+    else:
+        cache[url] = util.fetch_mf2(url)
+
+    # callers modify the returned mf2
+    return copy.deepcopy(cache[url])
+
+
 class Web(User, Protocol):
     """Web user and webmention protocol implementation.
 
@@ -609,7 +648,7 @@ class Web(User, Protocol):
             author = util.get_first(props, 'author')
             if not isinstance(author, dict):
                 logger.info(f'Fetching full authorship for author {author}')
-                fetch_fn = util.fetch_mf2 if authorship_fetch_mf2 else None
+                fetch_fn = fetch_author_mf2 if authorship_fetch_mf2 else None
                 try:
                     author = mf2util.find_author({'items': [entry]}, hentry=entry,
                                                  fetch_mf2_func=fetch_fn)
@@ -811,7 +850,8 @@ def poll_feed(user, feed_url, rel_type):
             if url := elem.get('url'):
                 elem['id'] = elem['url']
 
-        logger.debug(f'Converted to AS1: {json_dumps(activity, indent=2)}')
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f'Converted to AS1: {json_dumps(activity, indent=2)}')
 
         id = Object(our_as1=activity).as1.get('id')
         if not id:
@@ -942,6 +982,9 @@ def webmention_task():
     """
     logger.info(f'Params: {list(request.form.items())}')
 
+    # cap and memoize authorship fetches for the rest of this request
+    request.environ[AUTHOR_MF2_ENVIRON_KEY] = {}
+
     # load user
     source = flask_util.get_required_param('source').strip()
     domain = domain_from_link(source, minimize=False)
@@ -5,8 +5,10 @@
 """
 from datetime import timedelta
 import logging
+from threading import Lock
 from urllib.parse import urljoin, urlparse
 
+import cachetools
 from flask import render_template, request
 from granary import as2
 from oauth_dropins.webutil import flask_util, util
@@ -28,6 +30,19 @@ from web import Web
 
 SUBSCRIBE_LINK_REL = 'http://ostatus.org/schema/1.0/subscribe'
 
+# how long to cache results of fetching remote WebFinger. failures are cached
+# for less time so that we retry them sooner.
+FETCH_CACHE_TTL = timedelta(hours=1)
+FETCH_NEGATIVE_CACHE_TTL = timedelta(seconds=60)
+
+# caches generated WebFinger data. maps (request host, resource) to dict. only
+# meant to absorb bursts; CACHE_CONTROL already covers reuse across requests.
+# kept short since nothing evicts entries when a user opts out, disables
+# ActivityPub, or changes their handle.
+WEBFINGER_CACHE_TTL = timedelta(minutes=2)
+webfinger_cache = cachetools.TTLCache(10000, WEBFINGER_CACHE_TTL.total_seconds())
+webfinger_cache_lock = Lock()
+
 logger = logging.getLogger(__name__)
 
 
@@ -47,11 +62,34 @@ class Webfinger(flask_util.XrdOrJrd):
     def template_vars(self):
         # logger.debug(f'Headers: {list(request.headers.items())}')
 
+        host_url = common.host_url()
         resource = flask_util.get_required_param('resource').strip()
-        resource = resource.removeprefix(common.host_url())
+        resource = resource.removeprefix(host_url)
+
+        # the output depends on the request's host as well as the resource,
+        # but not on Accept; XrdOrJrd renders the same data as either
+        cache_key = (request.host, resource)
+        with webfinger_cache_lock:
+            if data := webfinger_cache.get(cache_key):
+                return data
+
+        data = self._template_vars(resource, host_url)
+        with webfinger_cache_lock:
+            webfinger_cache[cache_key] = data
+        return data
+
+    def _template_vars(self, resource, host_url):
+        """Generates WebFinger data for a resource.
+
+        Args:
+          resource (str): requested resource, with our host URL prefix removed
+          host_url (str): :func:`common.host_url` for this request
 
+        Returns:
+          dict: WebFinger data
+        """
         # handle Bridgy Fed actor URLs, eg https://fed.brid.gy/snarfed.org
-        host = util.domain_from_link(common.host_url())
+        host = util.domain_from_link(host_url)
         if resource in ('', '/', f'acct:{host}', f'acct:@{host}'):
             error('Expected other domain, not *.brid.gy')
 
@@ -250,28 +288,54 @@ def fetch(addr):
         flash('Enter a fediverse address in @user@domain.social format')
         return None
 
+    data, msg = _fetch(addr_domain, resource)
+    if msg:
+        flash(msg)
+    return data
+
+
+def _fetch_ttu(key, value, now):
+    """Time-to-use (expiration) for :func:`_fetch` cache entries."""
+    data, _ = value
+    ttl = FETCH_CACHE_TTL if data else FETCH_NEGATIVE_CACHE_TTL
+    return now + ttl.total_seconds()
+
+
+@cachetools.cached(cachetools.TLRUCache(10000, _fetch_ttu), lock=Lock())
+def _fetch(addr_domain, resource):
+    """Fetches WebFinger data for a resource from a domain. Caches the result.
+
+    Successful fetches are cached for :const:`FETCH_CACHE_TTL`, failures for
+    :const:`FETCH_NEGATIVE_CACHE_TTL`.
+
+    Args:
+      addr_domain (str)
+      resource (str)
+
+    Returns:
+      (dict, str) tuple: (WebFinger data, None) on success, (None, error
+      message) on failure
+    """
     try:
-        resp = util.requests_get(
-            f'https://{addr_domain}/.well-known/webfinger?resource={resource}')
+        with common.fail_fast(addr_domain):
+            resp = util.requests_get(
+                f'https://{addr_domain}/.well-known/webfinger?resource={resource}')
     except BaseException as e:
         if util.is_connection_failure(e):
-            flash(f"Couldn't connect to {addr_domain}")
-            return None
+            return None, f"Couldn't connect to {addr_domain}"
         raise
 
     if not resp.ok:
-        flash(f'WebFinger on {addr_domain} returned HTTP {resp.status_code}')
-        return None
+        return None, f'WebFinger on {addr_domain} returned HTTP {resp.status_code}'
 
     try:
         data = resp.json()
     except ValueError as e:
         logger.warning(f'Got {e}', exc_info=True)
-        flash(f'WebFinger on {addr_domain} returned non-JSON')
-        return None
+        return None, f'WebFinger on {addr_domain} returned non-JSON'
 
-    logger.info(f'Got WebFinger for {addr}')
-    return data
+    logger.info(f'Got WebFinger for {resource}')
+    return data, None
 
 
 def fetch_actor_url(addr):